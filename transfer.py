@@ -5,24 +5,34 @@ from __future__ import annotations
 
 import argparse
 import csv
-import io
+import heapq
+import itertools
 import os
+import re
 import sys
-from dataclasses import dataclass
-from datetime import datetime
-from typing import Dict, Iterable, List, Optional, Tuple, Any
+import threading
+from collections import Counter
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from time import perf_counter
+from typing import Callable, Collection, Dict, Iterable, Iterator, List, Optional, Tuple, Any
 
 from typing import TYPE_CHECKING
 
 if TYPE_CHECKING:  # pragma: no cover - typing only
     import psycopg  # type: ignore
 
+try:
+    import resource
+except ImportError:  # pragma: no cover - not available on Windows
+    resource = None  # type: ignore[assignment]
+
 _psycopg = None
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class ClimateRecord:
-    time: str
+    time: datetime
     home_tado_id: int
     zone_tado_id: int
     device_tado_id: Optional[str]
@@ -33,15 +43,124 @@ class ClimateRecord:
     source: str
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class WeatherRecord:
-    time: str
+    time: datetime
     home_tado_id: int
     outside_temp_c: Optional[float]
     weather_state: Optional[str]
     source: str
 
 
+# Parsed rows are kept column-wise; field order matches the temp tables so rows() feeds COPY directly.
+@dataclass
+class ClimateColumns:
+    time: List[datetime] = field(default_factory=list)
+    home_tado_id: List[int] = field(default_factory=list)
+    zone_tado_id: List[int] = field(default_factory=list)
+    device_tado_id: List[Optional[str]] = field(default_factory=list)
+    inside_temp_c: List[Optional[float]] = field(default_factory=list)
+    humidity_pct: List[Optional[float]] = field(default_factory=list)
+    setpoint_temp_c: List[Optional[float]] = field(default_factory=list)
+    heating_power_pct: List[Optional[float]] = field(default_factory=list)
+    source: List[str] = field(default_factory=list)
+
+    def __len__(self) -> int:
+        return len(self.time)
+
+    def append(
+        self,
+        time: datetime,
+        home_tado_id: int,
+        zone_tado_id: int,
+        device_tado_id: Optional[str],
+        inside_temp_c: Optional[float],
+        humidity_pct: Optional[float],
+        setpoint_temp_c: Optional[float],
+        heating_power_pct: Optional[float],
+        source: str,
+    ) -> None:
+        self.time.append(time)
+        self.home_tado_id.append(home_tado_id)
+        self.zone_tado_id.append(zone_tado_id)
+        self.device_tado_id.append(device_tado_id)
+        self.inside_temp_c.append(inside_temp_c)
+        self.humidity_pct.append(humidity_pct)
+        self.setpoint_temp_c.append(setpoint_temp_c)
+        self.heating_power_pct.append(heating_power_pct)
+        self.source.append(source)
+
+    def rows(self, indices: Optional[List[int]] = None) -> Iterator[Tuple[Any, ...]]:
+        columns = (
+            self.time,
+            self.home_tado_id,
+            self.zone_tado_id,
+            self.device_tado_id,
+            self.inside_temp_c,
+            self.humidity_pct,
+            self.setpoint_temp_c,
+            self.heating_power_pct,
+            self.source,
+        )
+        if indices is None:
+            return zip(*columns)
+        return zip(*(map(column.__getitem__, indices) for column in columns))
+
+    def record(self, index: int) -> ClimateRecord:
+        return ClimateRecord(
+            time=self.time[index],
+            home_tado_id=self.home_tado_id[index],
+            zone_tado_id=self.zone_tado_id[index],
+            device_tado_id=self.device_tado_id[index],
+            inside_temp_c=self.inside_temp_c[index],
+            humidity_pct=self.humidity_pct[index],
+            setpoint_temp_c=self.setpoint_temp_c[index],
+            heating_power_pct=self.heating_power_pct[index],
+            source=self.source[index],
+        )
+
+
+@dataclass
+class WeatherColumns:
+    time: List[datetime] = field(default_factory=list)
+    home_tado_id: List[int] = field(default_factory=list)
+    outside_temp_c: List[Optional[float]] = field(default_factory=list)
+    weather_state: List[Optional[str]] = field(default_factory=list)
+    source: List[str] = field(default_factory=list)
+
+    def __len__(self) -> int:
+        return len(self.time)
+
+    def append(
+        self,
+        time: datetime,
+        home_tado_id: int,
+        outside_temp_c: Optional[float],
+        weather_state: Optional[str],
+        source: str,
+    ) -> None:
+        self.time.append(time)
+        self.home_tado_id.append(home_tado_id)
+        self.outside_temp_c.append(outside_temp_c)
+        self.weather_state.append(weather_state)
+        self.source.append(source)
+
+    def rows(self, indices: Optional[List[int]] = None) -> Iterator[Tuple[Any, ...]]:
+        columns = (self.time, self.home_tado_id, self.outside_temp_c, self.weather_state, self.source)
+        if indices is None:
+            return zip(*columns)
+        return zip(*(map(column.__getitem__, indices) for column in columns))
+
+    def record(self, index: int) -> WeatherRecord:
+        return WeatherRecord(
+            time=self.time[index],
+            home_tado_id=self.home_tado_id[index],
+            outside_temp_c=self.outside_temp_c[index],
+            weather_state=self.weather_state[index],
+            source=self.source[index],
+        )
+
+
 def get_psycopg():
     global _psycopg
     if _psycopg is None:
@@ -63,6 +182,30 @@ HEATING_LEVELS = {
     "MEDIUM": 66.0,
     "HIGH": 100.0,
 }
+# Exports spell levels in upper or lower case; looking those up directly skips normalising every row.
+HEATING_LOOKUP = {**HEATING_LEVELS, **{level.lower(): pct for level, pct in HEATING_LEVELS.items()}}
+# Whole numericLevel steps between the clamped 0 and 3 ends; fractional levels are rejected.
+HEATING_STEPS = {1.0: 33.0, 2.0: 66.0}
+
+# Pending rows are fixed-size lists rather than dicts, one slot per column. The source tag is derived from the
+# parsed time when rows are emitted.
+CLIMATE_INSIDE_TEMP, CLIMATE_HUMIDITY, CLIMATE_SETPOINT, CLIMATE_HEATING = range(4)
+WEATHER_OUTSIDE_TEMP, WEATHER_STATE = range(2)
+
+# Influx (measurement, field) pairs that feed climate_measurements, mapped to the slot they populate.
+CLIMATE_FIELDS = {
+    ("humidity", "humidity"): CLIMATE_HUMIDITY,
+    ("call_for_heat", "numericLevel"): CLIMATE_HEATING,
+    ("temperature", "temperature"): CLIMATE_INSIDE_TEMP,
+    ("heating", "temperature"): CLIMATE_SETPOINT,
+}
+
+WEATHER_FIELD = ("weather", "temperature")
+
+IMPORTED_FIELDS = frozenset(CLIMATE_FIELDS) | {WEATHER_FIELD}
+
+# Cache-miss sentinel, distinct from a cached None.
+MISSING: Any = object()
 
 
 def parse_int(value: Optional[str]) -> Optional[int]:
@@ -91,7 +234,9 @@ def parse_float(value: Optional[str]) -> Optional[float]:
 
 def translate_heating(level: str, numeric_text: Optional[str]) -> Optional[float]:
     if level:
-        mapped = HEATING_LEVELS.get(level.strip().upper())
+        mapped = HEATING_LOOKUP.get(level)
+        if mapped is None:
+            mapped = HEATING_LEVELS.get(level.strip().upper())
         if mapped is not None:
             return mapped
     raw = parse_float(numeric_text)
@@ -99,175 +244,316 @@ def translate_heating(level: str, numeric_text: Optional[str]) -> Optional[float
         return None
     if raw <= 0:
         return 0.0
-    if raw == 1:
-        return 33.0
-    if raw == 2:
-        return 66.0
     if raw >= 3:
         return 100.0
-    return None
+    return HEATING_STEPS.get(raw)
 
 
 
-def determine_source(timestamp: str) -> str:
-    try:
-        dt = datetime.fromisoformat(timestamp.replace('Z', '+00:00'))
-    except ValueError:
-        return 'realtime'
-    if dt.second == 0 and dt.microsecond == 0 and dt.minute % 15 == 0:
-        return 'historical'
-    return 'realtime'
+HISTORICAL = sys.intern('historical')
+REALTIME = sys.intern('realtime')
 
+def determine_source(time: datetime) -> str:
+    if time.second == 0 and time.microsecond == 0 and time.minute % 15 == 0:
+        return HISTORICAL
+    return REALTIME
 
-def iter_influx_rows(path: str) -> Iterable[Dict[str, str]]:
-    def parse_line(line: str) -> List[str]:
-        return next(csv.reader([line]))
 
-    with open(path, newline="") as handle:
-        fieldnames: Optional[List[str]] = None
-        for raw in handle:
-            if not raw.strip():
-                continue
-            if raw.startswith("#"):
-                if raw.startswith("#group"):
-                    fieldnames = None
-                continue
-            if fieldnames is None:
-                fieldnames = parse_line(raw)
-                continue
-            values = parse_line(raw)
-            if len(values) < len(fieldnames):
-                values.extend([""] * (len(fieldnames) - len(values)))
-            elif len(values) > len(fieldnames):
-                values = values[: len(fieldnames)]
-            row = {name: value for name, value in zip(fieldnames, values) if name}
-            yield row
+def _is_annotation_or_blank(line: bytes) -> bool:
+    return line.startswith(b"#") or not line.strip()
 
 
-@dataclass
+# Fractional seconds of any precision. datetime only holds microseconds, and before Python 3.11 fromisoformat
+# only accepts exactly 3 or 6 digits, while Influx drops trailing zeros (".12") and writes up to nanoseconds.
+FRACTION_PATTERN = re.compile(r"\.(\d+)")
+
+
+def parse_timestamp(value: str) -> Optional[datetime]:
+    text = value.replace('Z', '+00:00')
+    microseconds = 0
+    fraction = FRACTION_PATTERN.search(text)
+    if fraction is not None:
+        digits = fraction.group(1)
+        # Round half up to the nearest microsecond like Postgres does; the timedelta carries into the seconds.
+        scale = 10 ** len(digits)
+        microseconds = (int(digits) * 1_000_000 + scale // 2) // scale
+        text = text[: fraction.start()] + text[fraction.end() :]
+    try:
+        parsed = datetime.fromisoformat(text)
+    except ValueError:
+        return None
+    if parsed.tzinfo is None:
+        # Influx always exports UTC; binary timestamptz needs an aware datetime.
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    if microseconds:
+        parsed += timedelta(microseconds=microseconds)
+    return parsed
+
+
+def _make_field_prefilter(fieldnames: List[str], wanted: Collection[Tuple[str, str]]) -> Callable[[bytes], bool]:
+    measurement_index = fieldnames.index("_measurement")
+    field_index = fieldnames.index("_field")
+    wanted_bytes = {(measurement.encode(), field_name.encode()) for measurement, field_name in wanted}
+
+    def keep(line: bytes) -> bool:
+        if b'"' in line:
+            # Quoted values may contain commas; leave those lines to the csv module.
+            return True
+        parts = line.split(b",")
+        try:
+            pair = (parts[measurement_index].strip(), parts[field_index].strip())
+        except IndexError:
+            return True
+        return pair in wanted_bytes
+
+    return keep
+
+
+READ_BLOCK_SIZE = 8 * 1024 * 1024
+
+
+def _read_lines(path: str, start: int, end: Optional[int]) -> Iterator[bytes]:
+    # Large binary reads split into lines in one call; decoding is left to the rows that survive filtering.
+    with open(path, "rb") as handle:
+        handle.seek(start)
+        remaining = None if end is None else end - start
+        carry = b""
+        while remaining is None or remaining > 0:
+            block = handle.read(READ_BLOCK_SIZE if remaining is None else min(READ_BLOCK_SIZE, remaining))
+            if not block:
+                break
+            if remaining is not None:
+                remaining -= len(block)
+            lines = (carry + block).splitlines(keepends=True)
+            # The last line may continue in the next block.
+            carry = lines.pop()
+            yield from lines
+        if carry:
+            yield carry
+
+
+def iter_influx_rows(
+    path: str,
+    wanted: Optional[Collection[Tuple[str, str]]] = None,
+    start: int = 0,
+    end: Optional[int] = None,
+) -> Iterable[Dict[str, str]]:
+    group_index = 0
+
+    def group_key(line: bytes) -> int:
+        nonlocal group_index
+        if line.startswith(b"#group"):
+            group_index += 1
+        return group_index
+
+    # Each `#group` annotation starts a new table with its own header row; a single csv.reader
+    # streams every data line of that table instead of constructing a parser per line.
+    for _, lines in itertools.groupby(_read_lines(path, start, end), key=group_key):
+        data_lines: Iterator[bytes] = itertools.filterfalse(_is_annotation_or_blank, lines)
+        header = next(data_lines, None)
+        if header is None:
+            continue
+        fieldnames = next(csv.reader([header.decode()]))
+        if wanted is not None and "_measurement" in fieldnames and "_field" in fieldnames:
+            # Plain split is far cheaper than full CSV parsing and rejects most rows of an export.
+            data_lines = filter(_make_field_prefilter(fieldnames, wanted), data_lines)
+        for values in csv.reader(map(bytes.decode, data_lines)):
+            yield {
+                name: value
+                for name, value in itertools.zip_longest(fieldnames, values, fillvalue="")
+                if name
+            }
+
+
+GROUP_MARKER = b"\n#group"
+
+
+# Byte ranges of roughly equal size, each starting at a `#group` annotation so every table stays whole.
+def split_into_slices(path: str, count: int) -> List[Tuple[int, Optional[int]]]:
+    size = os.path.getsize(path)
+    target = max(1, size // max(1, count))
+    boundaries = [0]
+
+    def add_group_start(position: int) -> None:
+        if position - boundaries[-1] >= target:
+            boundaries.append(position)
+
+    # Scan in the same large blocks as _read_lines; the few bytes kept from the previous block catch a marker
+    # that straddles two reads.
+    with open(path, "rb") as handle:
+        offset = 0
+        tail = b""
+        while True:
+            block = handle.read(READ_BLOCK_SIZE)
+            if not block:
+                break
+            index = (tail + block[: len(GROUP_MARKER) - 1]).find(GROUP_MARKER)
+            if index != -1:
+                add_group_start(offset - len(tail) + index + 1)
+            index = block.find(GROUP_MARKER)
+            while index != -1:
+                add_group_start(offset + index + 1)
+                index = block.find(GROUP_MARKER, index + 1)
+            tail = block[-(len(GROUP_MARKER) - 1) :]
+            offset += len(block)
+    ends: List[Optional[int]] = list(boundaries[1:])
+    ends.append(None)
+    return list(zip(boundaries, ends))
+
+
+ClimatePending = Dict[Tuple[str, int, Optional[int], Optional[str]], List[Any]]
+WeatherPending = Dict[Tuple[str, int], List[Any]]
+
+
+@dataclass(slots=True)
 class ParseSummary:
-    climate_rows: List[ClimateRecord]
-    weather_rows: List[WeatherRecord]
+    climate: ClimateColumns
+    weather: WeatherColumns
     skipped_missing_home: int
     skipped_missing_zone: int
+    skipped_invalid_time: int
+    parse_workers: int
 
 
-def parse_csv(path: str) -> ParseSummary:
-    reader = iter_influx_rows(path)
-    climate: Dict[Tuple[str, int, int, Optional[str]], Dict[str, Optional[float]]] = {}
-    weather: Dict[Tuple[str, int], Dict[str, Optional[float]]] = {}
+def parse_slice(path: str, start: int, end: Optional[int]) -> Tuple[ClimatePending, WeatherPending, int]:
+    climate: ClimatePending = {}
+    weather: WeatherPending = {}
     skipped_home = 0
-    skipped_zone = 0
+    # Device ids and weather states repeat across millions of rows; keep one shared object per value.
+    canonical: Dict[str, str] = {}
+    # homeId/zoneId take only a handful of distinct values, so each raw text is parsed once.
+    home_ids: Dict[Optional[str], Optional[int]] = {}
+    zone_ids: Dict[Optional[str], Optional[int]] = {}
 
-    for row in reader:
+    for row in iter_influx_rows(path, IMPORTED_FIELDS, start, end):
         measurement = (row.get("_measurement") or "").strip()
-        field = (row.get("_field") or "").strip()
-        if not measurement or not field:
-            continue
-        if measurement == "_measurement" and field == "_field":
-            continue
-        if "intervalCumulativeHelper" in (measurement, field):
-            continue
-        if measurement == "weather_sunny" or field == "sunny":
+        field_name = (row.get("_field") or "").strip()
+        target = CLIMATE_FIELDS.get((measurement, field_name))
+        if target is None and (measurement, field_name) != WEATHER_FIELD:
             continue
 
         timestamp = (row.get("_time") or "").strip()
         if not timestamp:
             continue
-        home_id = parse_int(row.get("homeId"))
+        raw_home = row.get("homeId")
+        home_id = home_ids.get(raw_home, MISSING)
+        if home_id is MISSING:
+            home_id = home_ids[raw_home] = parse_int(raw_home)
         if home_id is None:
             skipped_home += 1
             continue
 
-        zone_id = parse_int(row.get("zoneId"))
-        device_id = (row.get("deviceId") or "").strip() or None
         level_text = (row.get("callForHeatLevel") or "").strip()
         raw_value = row.get("_value")
-        numeric_value = parse_float(raw_value)
-
-        key = (timestamp, home_id, zone_id, device_id)
 
-        if measurement == "humidity" and field == "humidity":
-            if numeric_value is None:
+        if target is not None:
+            if target == CLIMATE_HEATING:
+                value = translate_heating(level_text, raw_value)
+            else:
+                value = parse_float(raw_value)
+                if value is not None and target == CLIMATE_HUMIDITY:
+                    value = max(0.0, min(100.0, value * 100.0))
+            if value is None:
                 continue
-            entry = climate.setdefault(key, {})
-            entry.setdefault('source', determine_source(timestamp))
-            entry.setdefault("humidity_pct", max(0.0, min(100.0, numeric_value * 100.0)))
-        elif measurement == "call_for_heat" and field == "numericLevel":
-            pct = translate_heating(level_text, raw_value)
-            if pct is None:
-                continue
-            entry = climate.setdefault(key, {})
-            entry.setdefault('source', determine_source(timestamp))
-            entry.setdefault("heating_power_pct", pct)
-        elif measurement == "temperature" and field == "temperature":
-            if numeric_value is None:
-                continue
-            entry = climate.setdefault(key, {})
-            entry.setdefault('source', determine_source(timestamp))
-            entry.setdefault("inside_temp_c", numeric_value)
-        elif measurement == "heating" and field == "temperature":
-            if numeric_value is None:
-                continue
-            entry = climate.setdefault(key, {})
-            entry.setdefault('source', determine_source(timestamp))
-            entry.setdefault("setpoint_temp_c", numeric_value)
-        elif measurement == "weather" and field == "temperature":
+            raw_zone = row.get("zoneId")
+            zone_id = zone_ids.get(raw_zone, MISSING)
+            if zone_id is MISSING:
+                zone_id = zone_ids[raw_zone] = parse_int(raw_zone)
+            device_id = (row.get("deviceId") or "").strip() or None
+            if device_id is not None:
+                device_id = canonical.setdefault(device_id, device_id)
+            key = (timestamp, home_id, zone_id, device_id)
+            entry = climate.get(key)
+            if entry is None:
+                entry = climate[key] = [None, None, None, None]
+            if entry[target] is None:
+                entry[target] = value
+        else:
+            numeric_value = parse_float(raw_value)
             if numeric_value is None and not level_text:
                 continue
             wkey = (timestamp, home_id)
-            entry = weather.setdefault(wkey, {})
-            entry.setdefault('source', determine_source(timestamp))
-            if numeric_value is not None:
-                entry.setdefault("outside_temp_c", numeric_value)
-            if level_text:
-                entry.setdefault("weather_state", level_text)
-        else:
+            entry = weather.get(wkey)
+            if entry is None:
+                entry = weather[wkey] = [None, None]
+            if numeric_value is not None and entry[WEATHER_OUTSIDE_TEMP] is None:
+                entry[WEATHER_OUTSIDE_TEMP] = numeric_value
+            if level_text and entry[WEATHER_STATE] is None:
+                entry[WEATHER_STATE] = canonical.setdefault(level_text, level_text)
+
+    return climate, weather, skipped_home
+
+
+def merge_pending(target: Dict[Any, List[Any]], partial: Dict[Any, List[Any]]) -> None:
+    for key, entry in partial.items():
+        existing = target.setdefault(key, entry)
+        if existing is entry:
             continue
+        # First value still wins per column; fill only the slots that are still empty.
+        for slot in range(len(entry)):
+            if existing[slot] is None:
+                existing[slot] = entry[slot]
 
-    climate_rows: List[ClimateRecord] = []
-    for (timestamp, home_id, zone_id, device_id), payload in sorted(
-        climate.items(), key=lambda item: (item[0][0], item[0][1], item[0][2], item[0][3] or "")
-    ):
+
+def parse_csv(path: str, jobs: int = 1) -> ParseSummary:
+    climate: ClimatePending = {}
+    weather: WeatherPending = {}
+    skipped_home = 0
+    skipped_zone = 0
+    skipped_time = 0
+
+    slices = split_into_slices(path, jobs * 4) if jobs > 1 else [(0, None)]
+    if len(slices) > 1:
+        from concurrent.futures import ProcessPoolExecutor
+
+        # Slices are merged in file order, so the first value per key still wins as in a sequential parse.
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            starts, ends = zip(*slices)
+            partials: Iterable[Tuple[ClimatePending, WeatherPending, int]] = executor.map(
+                parse_slice, itertools.repeat(path), starts, ends
+            )
+            for part_climate, part_weather, part_skipped in partials:
+                merge_pending(climate, part_climate)
+                merge_pending(weather, part_weather)
+                skipped_home += part_skipped
+    else:
+        climate, weather, skipped_home = parse_slice(path, 0, None)
+
+    # COPY does not need ordered input, so rows are emitted in first-seen order.
+    climate_columns = ClimateColumns()
+    for (timestamp, home_id, zone_id, device_id), (inside, humidity, setpoint, heating) in climate.items():
         if zone_id is None:
             skipped_zone += 1
             continue
-        climate_rows.append(
-            ClimateRecord(
-                time=timestamp,
-                home_tado_id=home_id,
-                zone_tado_id=zone_id,
-                device_tado_id=device_id,
-                inside_temp_c=payload.get("inside_temp_c"),
-                humidity_pct=payload.get("humidity_pct"),
-                setpoint_temp_c=payload.get("setpoint_temp_c"),
-                heating_power_pct=payload.get("heating_power_pct"),
-                source=payload.get('source', 'historical'),
-            )
+        time = parse_timestamp(timestamp)
+        if time is None:
+            skipped_time += 1
+            continue
+        climate_columns.append(
+            time, home_id, zone_id, device_id, inside, humidity, setpoint, heating, determine_source(time)
         )
 
-    weather_rows: List[WeatherRecord] = [
-        WeatherRecord(
-            time=timestamp,
-            home_tado_id=home_id,
-            outside_temp_c=payload.get("outside_temp_c"),
-            weather_state=payload.get("weather_state"),
-            source=payload.get('source', 'historical'),
-        )
-        for (timestamp, home_id), payload in sorted(weather.items(), key=lambda item: (item[0][0], item[0][1]))
-    ]
+    weather_columns = WeatherColumns()
+    for (timestamp, home_id), (outside, state) in weather.items():
+        time = parse_timestamp(timestamp)
+        if time is None:
+            skipped_time += 1
+            continue
+        weather_columns.append(time, home_id, outside, state, determine_source(time))
 
     return ParseSummary(
-        climate_rows=climate_rows,
-        weather_rows=weather_rows,
+        climate=climate_columns,
+        weather=weather_columns,
         skipped_missing_home=skipped_home,
         skipped_missing_zone=skipped_zone,
+        skipped_invalid_time=skipped_time,
+        parse_workers=min(jobs, len(slices)) if len(slices) > 1 else 0,
     )
 
 
 def write_summary(summary: ParseSummary) -> None:
-    print(f"Climate rows prepared: {len(summary.climate_rows)}", file=sys.stderr)
-    print(f"Weather rows prepared: {len(summary.weather_rows)}", file=sys.stderr)
+    print(f"Climate rows prepared: {len(summary.climate)}", file=sys.stderr)
+    print(f"Weather rows prepared: {len(summary.weather)}", file=sys.stderr)
     if summary.skipped_missing_home:
         print(
             f"Skipped rows missing homeId: {summary.skipped_missing_home}",
@@ -278,9 +564,20 @@ def write_summary(summary: ParseSummary) -> None:
             f"Skipped climate points missing zoneId: {summary.skipped_missing_zone}",
             file=sys.stderr,
         )
-
-
-
+    if summary.skipped_invalid_time:
+        print(
+            f"Skipped rows with unparseable _time: {summary.skipped_invalid_time}",
+            file=sys.stderr,
+        )
+    if resource is not None:
+        # ru_maxrss is reported in bytes on macOS and in kilobytes elsewhere.
+        scale = 1024 * 1024 if sys.platform == "darwin" else 1024
+        parent_peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / scale
+        print(f"Peak memory usage (main process): {parent_peak:.1f} MiB", file=sys.stderr)
+        if summary.parse_workers:
+            # The parse ran in worker processes; RUSAGE_CHILDREN reports the peak of the largest one.
+            worker_peak = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / scale
+            print(f"Peak memory usage (largest parse worker): {worker_peak:.1f} MiB", file=sys.stderr)
 
 
 def display_sample(summary: ParseSummary, *, max_rows: int = 3) -> None:
@@ -288,11 +585,23 @@ def display_sample(summary: ParseSummary, *, max_rows: int = 3) -> None:
         return '-' if value is None else f'{value:.2f}'
 
     print('Sample climate rows:', file=sys.stderr)
-    if summary.climate_rows:
-        for row in summary.climate_rows[:max_rows]:
+    climate = summary.climate
+    if climate:
+        earliest = heapq.nsmallest(
+            max_rows,
+            range(len(climate)),
+            key=lambda i: (
+                climate.time[i],
+                climate.home_tado_id[i],
+                climate.zone_tado_id[i],
+                climate.device_tado_id[i] or "",
+            ),
+        )
+        for index in earliest:
+            row = climate.record(index)
             device = row.device_tado_id or '-'
             print(
-                f"  {row.time} home={row.home_tado_id} zone={row.zone_tado_id} "
+                f"  {row.time.isoformat()} home={row.home_tado_id} zone={row.zone_tado_id} "
                 f"device={device} inside={fmt_float(row.inside_temp_c)} "
                 f"humidity={fmt_float(row.humidity_pct)} "
                 f"setpoint={fmt_float(row.setpoint_temp_c)} "
@@ -303,11 +612,16 @@ def display_sample(summary: ParseSummary, *, max_rows: int = 3) -> None:
         print('  (none)', file=sys.stderr)
 
     print('Sample weather rows:', file=sys.stderr)
-    if summary.weather_rows:
-        for row in summary.weather_rows[:max_rows]:
+    weather = summary.weather
+    if weather:
+        earliest = heapq.nsmallest(
+            max_rows, range(len(weather)), key=lambda i: (weather.time[i], weather.home_tado_id[i])
+        )
+        for index in earliest:
+            row = weather.record(index)
             state = row.weather_state or '-'
             print(
-                f"  {row.time} home={row.home_tado_id} outside={fmt_float(row.outside_temp_c)} state={state} source={row.source}",
+                f"  {row.time.isoformat()} home={row.home_tado_id} outside={fmt_float(row.outside_temp_c)} state={state} source={row.source}",
                 file=sys.stderr,
             )
     else:
@@ -315,18 +629,18 @@ def display_sample(summary: ParseSummary, *, max_rows: int = 3) -> None:
 
 
 
-def display_sql_preview(cursor: Any, *, preview_limit: int = 3) -> None:
+def display_sql_preview(cursor: Any, *, preview_limit: int = 3, scope: str = '') -> None:
     def fmt_float(value: Optional[float]) -> str:
         return '-' if value is None else f'{value:.2f}'
 
-    print('Database preview (climate_measurements):', file=sys.stderr)
+    print(f'Database preview (climate_measurements{scope}):', file=sys.stderr)
     cursor.execute(
         """
         SELECT
             c.time,
             h.id AS home_id,
             CASE WHEN c.tado_zone_id IS NULL THEN NULL ELSE z.id END AS zone_id,
-            CASE WHEN NULLIF(c.tado_device_id, '') IS NULL THEN NULL ELSE d.id END AS device_id,
+            CASE WHEN c.tado_device_id IS NULL THEN NULL ELSE d.id END AS device_id,
             c.inside_temp_c,
             c.humidity_pct,
             c.setpoint_temp_c,
@@ -335,7 +649,7 @@ def display_sql_preview(cursor: Any, *, preview_limit: int = 3) -> None:
         FROM tmp_climate c
         JOIN homes h ON h.tado_home_id = c.tado_home_id
         LEFT JOIN zones z ON z.home_id = h.id AND c.tado_zone_id = z.tado_zone_id
-        LEFT JOIN devices d ON d.home_id = h.id AND d.tado_device_id = NULLIF(c.tado_device_id, '')
+        LEFT JOIN devices d ON d.home_id = h.id AND d.tado_device_id = c.tado_device_id
         ORDER BY c.time
         LIMIT %s
         """
@@ -355,7 +669,7 @@ def display_sql_preview(cursor: Any, *, preview_limit: int = 3) -> None:
     else:
         print('  (none)', file=sys.stderr)
 
-    print('Database preview (weather_measurements):', file=sys.stderr)
+    print(f'Database preview (weather_measurements{scope}):', file=sys.stderr)
     cursor.execute(
         """
         SELECT
@@ -383,259 +697,348 @@ def display_sql_preview(cursor: Any, *, preview_limit: int = 3) -> None:
 
 
 
-def copy_rows(cursor: Any, sql: str, headers: List[str], rows: Iterable[Iterable[object]]) -> None:
-    buffer = io.StringIO()
-    writer = csv.writer(buffer)
-    writer.writerow(headers)
-    for row in rows:
-        writer.writerow(row)
-    buffer.seek(0)
+def copy_rows(cursor: Any, sql: str, types: List[str], rows: Iterable[Tuple[object, ...]]) -> None:
     with cursor.copy(sql) as copy:
-        copy.write(buffer.read())
+        copy.set_types(types)
+        for row in rows:
+            copy.write_row(row)
 
 
-def upsert_into_database(
-    database_url: str, summary: ParseSummary, dry_run_rollback: bool
+def upsert_rows(
+    conn: Any,
+    climate_rows: Iterable[Tuple[Any, ...]],
+    weather_rows: Iterable[Tuple[Any, ...]],
+    preview: Optional[str],
+    connections: int = 1,
 ) -> Tuple[int, int, int, int]:
-    psycopg = get_psycopg()
-    try:
-        with psycopg.connect(database_url) as conn:
-            with conn.cursor() as cur:
-                cur.execute(
-                    """
-                    CREATE TEMP TABLE tmp_climate (
-                        time timestamptz NOT NULL,
-                        tado_home_id bigint NOT NULL,
-                        tado_zone_id bigint,
-                        tado_device_id text,
-                        inside_temp_c double precision,
-                        humidity_pct double precision,
-                        setpoint_temp_c double precision,
-                        heating_power_pct double precision,
-                        source text NOT NULL
-                    )
-                    """
-                )
-
-                copy_rows(
-                    cur,
-                    "COPY tmp_climate (time, tado_home_id, tado_zone_id, tado_device_id, inside_temp_c, "
-                    "humidity_pct, setpoint_temp_c, heating_power_pct, source) FROM STDIN WITH (FORMAT CSV, HEADER true)",
-                    [
-                        "time",
-                        "tado_home_id",
-                        "tado_zone_id",
-                        "tado_device_id",
-                        "inside_temp_c",
-                        "humidity_pct",
-                        "setpoint_temp_c",
-                        "heating_power_pct",
-                        "source",
-                    ],
-                    (
-                        (
-                            row.time,
-                            row.home_tado_id,
-                            row.zone_tado_id,
-                            row.device_tado_id or "",
-                            row.inside_temp_c,
-                            row.humidity_pct,
-                            row.setpoint_temp_c,
-                            row.heating_power_pct,
-                            row.source,
-                        )
-                        for row in summary.climate_rows
-                    ),
-                )
+    with conn.cursor() as cur:
+        # Session-scoped bulk-load tuning, sent in one round-trip. temp_buffers must be set before the first
+        # temp table is touched; skipping the commit fsync is safe because a lost import can simply be re-run.
+        # The memory budgets are shared between the backends of a --db-connections run.
+        cur.execute(
+            f"SET work_mem = '{max(32, 256 // connections)}MB'; "
+            f"SET maintenance_work_mem = '{max(64, 512 // connections)}MB'; "
+            f"SET temp_buffers = '{max(32, 256 // connections)}MB'; "
+            "SET synchronous_commit = off; "
+            "SET statement_timeout = 0"
+        )
 
-                cur.execute(
-                    """
-                    CREATE TEMP TABLE tmp_weather (
-                        time timestamptz NOT NULL,
-                        tado_home_id bigint NOT NULL,
-                        outside_temp_c double precision,
-                        weather_state text,
-                        source text NOT NULL
-                    )
-                    """
-                )
+        cur.execute(
+            """
+            CREATE TEMP TABLE tmp_climate (
+                time timestamptz NOT NULL,
+                tado_home_id bigint NOT NULL,
+                tado_zone_id bigint,
+                tado_device_id text,
+                inside_temp_c double precision,
+                humidity_pct double precision,
+                setpoint_temp_c double precision,
+                heating_power_pct double precision,
+                source text NOT NULL
+            )
+            """
+        )
 
-                copy_rows(
-                    cur,
-                    "COPY tmp_weather (time, tado_home_id, outside_temp_c, weather_state, source) "
-                    "FROM STDIN WITH (FORMAT CSV, HEADER true)",
-                    ["time", "tado_home_id", "outside_temp_c", "weather_state", "source"],
-                    (
-                        (
-                            row.time,
-                            row.home_tado_id,
-                            row.outside_temp_c,
-                            row.weather_state or "",
-                            row.source,
-                        )
-                        for row in summary.weather_rows
-                    ),
-                )
+        copy_rows(
+            cur,
+            "COPY tmp_climate (time, tado_home_id, tado_zone_id, tado_device_id, inside_temp_c, "
+            "humidity_pct, setpoint_temp_c, heating_power_pct, source) FROM STDIN (FORMAT BINARY)",
+            ["timestamptz", "int8", "int8", "text", "float8", "float8", "float8", "float8", "text"],
+            climate_rows,
+        )
+        # Temp tables are never auto-analyzed; give the planner real row counts for the joins below.
+        cur.execute("CREATE INDEX ON tmp_climate (tado_home_id)")
+        cur.execute("CREATE INDEX ON tmp_climate (tado_zone_id)")
+        cur.execute("CREATE INDEX ON tmp_climate (tado_device_id)")
+        cur.execute("ANALYZE tmp_climate")
+
+        cur.execute(
+            """
+            CREATE TEMP TABLE tmp_weather (
+                time timestamptz NOT NULL,
+                tado_home_id bigint NOT NULL,
+                outside_temp_c double precision,
+                weather_state text,
+                source text NOT NULL
+            )
+            """
+        )
 
-                cur.execute(
-                    """
-                    SELECT COUNT(*)
-                    FROM tmp_climate c
-                    LEFT JOIN homes h ON h.tado_home_id = c.tado_home_id
-                    WHERE h.id IS NULL
-                    """
-                )
-                if cur.fetchone()[0]:
-                    raise RuntimeError("Missing homes for some climate rows")
-
-                cur.execute(
-                    """
-                    SELECT COUNT(*)
-                    FROM tmp_weather w
-                    LEFT JOIN homes h ON h.tado_home_id = w.tado_home_id
-                    WHERE h.id IS NULL
-                    """
-                )
-                if cur.fetchone()[0]:
-                    raise RuntimeError("Missing homes for some weather rows")
-
-                cur.execute(
-                    """
-                    SELECT COUNT(*)
-                    FROM tmp_climate c
-                    JOIN homes h ON h.tado_home_id = c.tado_home_id
-                    LEFT JOIN zones z ON z.home_id = h.id AND z.tado_zone_id = c.tado_zone_id
-                    WHERE c.tado_zone_id IS NOT NULL AND z.id IS NULL
-                    """
-                )
-                if cur.fetchone()[0]:
-                    raise RuntimeError("Missing zones for some climate rows")
-
-                display_sql_preview(cur)
-
-                cur.execute(
-                    """
-                    WITH mapped AS (
-                        SELECT
-                            c.time,
-                            h.id AS home_id,
-                            CASE WHEN c.tado_zone_id IS NULL THEN NULL ELSE z.id END AS zone_id,
-                            CASE WHEN NULLIF(c.tado_device_id, '') IS NULL
-                                THEN NULL
-                                ELSE d.id
-                            END AS device_id,
-                            c.inside_temp_c,
-                            c.humidity_pct,
-                            c.setpoint_temp_c,
-                            c.heating_power_pct,
-                            c.source
-                        FROM tmp_climate c
-                        JOIN homes h ON h.tado_home_id = c.tado_home_id
-                        LEFT JOIN zones z ON z.home_id = h.id AND z.tado_zone_id = c.tado_zone_id
-                        LEFT JOIN devices d ON d.home_id = h.id AND d.tado_device_id = NULLIF(c.tado_device_id, '')
-                    ), upsert AS (
-                        INSERT INTO climate_measurements (
-                            time,
-                            home_id,
-                            zone_id,
-                            device_id,
-                            source,
-                            inside_temp_c,
-                            humidity_pct,
-                            setpoint_temp_c,
-                            heating_power_pct,
-                            ac_power_on,
-                            ac_mode,
-                            window_open,
-                            battery_low,
-                            connection_up
-                        )
-                        SELECT
-                            time,
-                            home_id,
-                            zone_id,
-                            device_id,
-                            source,
-                            inside_temp_c,
-                            humidity_pct,
-                            setpoint_temp_c,
-                            heating_power_pct,
-                            NULL,
-                            NULL,
-                            NULL,
-                            NULL,
-                            NULL
-                        FROM mapped
-                        ON CONFLICT (time, home_id, source, zone_id, device_id)
-                        DO UPDATE SET
-                            inside_temp_c = COALESCE(EXCLUDED.inside_temp_c, climate_measurements.inside_temp_c),
-                            humidity_pct = COALESCE(EXCLUDED.humidity_pct, climate_measurements.humidity_pct),
-                            setpoint_temp_c = COALESCE(EXCLUDED.setpoint_temp_c, climate_measurements.setpoint_temp_c),
-                            heating_power_pct = COALESCE(EXCLUDED.heating_power_pct, climate_measurements.heating_power_pct),
-                            ac_power_on = COALESCE(EXCLUDED.ac_power_on, climate_measurements.ac_power_on),
-                            ac_mode = COALESCE(EXCLUDED.ac_mode, climate_measurements.ac_mode),
-                            window_open = COALESCE(EXCLUDED.window_open, climate_measurements.window_open),
-                            battery_low = COALESCE(EXCLUDED.battery_low, climate_measurements.battery_low),
-                            connection_up = COALESCE(EXCLUDED.connection_up, climate_measurements.connection_up)
-                        RETURNING (xmax = 0) AS inserted
-                    )
-                    SELECT
-                        COALESCE(SUM(CASE WHEN inserted THEN 1 ELSE 0 END), 0) AS inserted,
-                        COALESCE(SUM(CASE WHEN inserted THEN 0 ELSE 1 END), 0) AS updated
-                    FROM upsert
-                    """
+        copy_rows(
+            cur,
+            "COPY tmp_weather (time, tado_home_id, outside_temp_c, weather_state, source) "
+            "FROM STDIN (FORMAT BINARY)",
+            ["timestamptz", "int8", "float8", "text", "text"],
+            weather_rows,
+        )
+        cur.execute("CREATE INDEX ON tmp_weather (tado_home_id)")
+        cur.execute("ANALYZE tmp_weather")
+
+        if preview is not None:
+            display_sql_preview(cur, scope=preview)
+
+        cur.execute(
+            """
+            WITH mapped AS (
+                SELECT
+                    c.time,
+                    h.id AS home_id,
+                    CASE WHEN c.tado_zone_id IS NULL THEN NULL ELSE z.id END AS zone_id,
+                    CASE WHEN c.tado_device_id IS NULL
+                        THEN NULL
+                        ELSE d.id
+                    END AS device_id,
+                    c.inside_temp_c,
+                    c.humidity_pct,
+                    c.setpoint_temp_c,
+                    c.heating_power_pct,
+                    c.source
+                FROM tmp_climate c
+                JOIN homes h ON h.tado_home_id = c.tado_home_id
+                LEFT JOIN zones z ON z.home_id = h.id AND z.tado_zone_id = c.tado_zone_id
+                LEFT JOIN devices d ON d.home_id = h.id AND d.tado_device_id = c.tado_device_id
+                WHERE c.inside_temp_c IS NOT NULL
+                    OR c.humidity_pct IS NOT NULL
+                    OR c.setpoint_temp_c IS NOT NULL
+                    OR c.heating_power_pct IS NOT NULL
+            ), upsert AS (
+                INSERT INTO climate_measurements (
+                    time,
+                    home_id,
+                    zone_id,
+                    device_id,
+                    source,
+                    inside_temp_c,
+                    humidity_pct,
+                    setpoint_temp_c,
+                    heating_power_pct
                 )
-                climate_inserted, climate_updated = cur.fetchone()
-
-                cur.execute(
-                    """
-                    WITH mapped AS (
-                        SELECT
-                            w.time,
-                            h.id AS home_id,
-                            w.outside_temp_c,
-                            NULLIF(w.weather_state, '') AS weather_state,
-                            w.source
-                        FROM tmp_weather w
-                        JOIN homes h ON h.tado_home_id = w.tado_home_id
-                    ), upsert AS (
-                        INSERT INTO weather_measurements (
-                            time,
-                            home_id,
-                            source,
-                            outside_temp_c,
-                            solar_intensity_pct,
-                            weather_state
-                        )
-                        SELECT
-                            time,
-                            home_id,
-                            source,
-                            outside_temp_c,
-                            NULL,
-                            weather_state
-                        FROM mapped
-                        ON CONFLICT (home_id, time, source)
-                        DO UPDATE SET
-                            outside_temp_c = COALESCE(EXCLUDED.outside_temp_c, weather_measurements.outside_temp_c),
-                            solar_intensity_pct = COALESCE(EXCLUDED.solar_intensity_pct, weather_measurements.solar_intensity_pct),
-                            weather_state = COALESCE(EXCLUDED.weather_state, weather_measurements.weather_state)
-                        RETURNING (xmax = 0) AS inserted
-                    )
-                    SELECT
-                        COALESCE(SUM(CASE WHEN inserted THEN 1 ELSE 0 END), 0) AS inserted,
-                        COALESCE(SUM(CASE WHEN inserted THEN 0 ELSE 1 END), 0) AS updated
-                    FROM upsert
-                    """
+                SELECT
+                    time,
+                    home_id,
+                    zone_id,
+                    device_id,
+                    source,
+                    inside_temp_c,
+                    humidity_pct,
+                    setpoint_temp_c,
+                    heating_power_pct
+                FROM mapped
+                ON CONFLICT (time, home_id, source, zone_id, device_id)
+                DO UPDATE SET
+                    inside_temp_c = COALESCE(EXCLUDED.inside_temp_c, climate_measurements.inside_temp_c),
+                    humidity_pct = COALESCE(EXCLUDED.humidity_pct, climate_measurements.humidity_pct),
+                    setpoint_temp_c = COALESCE(EXCLUDED.setpoint_temp_c, climate_measurements.setpoint_temp_c),
+                    heating_power_pct = COALESCE(EXCLUDED.heating_power_pct, climate_measurements.heating_power_pct)
+                RETURNING (xmax = 0) AS inserted
+            )
+            SELECT
+                COALESCE(SUM(CASE WHEN inserted THEN 1 ELSE 0 END), 0) AS inserted,
+                COALESCE(SUM(CASE WHEN inserted THEN 0 ELSE 1 END), 0) AS updated
+            FROM upsert
+            """
+        )
+        climate_inserted, climate_updated = cur.fetchone()
+
+        cur.execute(
+            """
+            WITH mapped AS (
+                SELECT
+                    w.time,
+                    h.id AS home_id,
+                    w.outside_temp_c,
+                    NULLIF(w.weather_state, '') AS weather_state,
+                    w.source
+                FROM tmp_weather w
+                JOIN homes h ON h.tado_home_id = w.tado_home_id
+                WHERE w.outside_temp_c IS NOT NULL OR NULLIF(w.weather_state, '') IS NOT NULL
+            ), upsert AS (
+                INSERT INTO weather_measurements (
+                    time,
+                    home_id,
+                    source,
+                    outside_temp_c,
+                    weather_state
                 )
-                weather_inserted, weather_updated = cur.fetchone()
+                SELECT
+                    time,
+                    home_id,
+                    source,
+                    outside_temp_c,
+                    weather_state
+                FROM mapped
+                ON CONFLICT (home_id, time, source)
+                DO UPDATE SET
+                    outside_temp_c = COALESCE(EXCLUDED.outside_temp_c, weather_measurements.outside_temp_c),
+                    weather_state = COALESCE(EXCLUDED.weather_state, weather_measurements.weather_state)
+                RETURNING (xmax = 0) AS inserted
+            )
+            SELECT
+                COALESCE(SUM(CASE WHEN inserted THEN 1 ELSE 0 END), 0) AS inserted,
+                COALESCE(SUM(CASE WHEN inserted THEN 0 ELSE 1 END), 0) AS updated
+            FROM upsert
+            """
+        )
+        weather_inserted, weather_updated = cur.fetchone()
+
+        return climate_inserted, climate_updated, weather_inserted, weather_updated
 
+
+def assign_homes(summary: ParseSummary, partitions: int) -> Dict[int, int]:
+    rows_per_home = Counter(summary.climate.home_tado_id)
+    rows_per_home.update(summary.weather.home_tado_id)
+    # Every home goes to exactly one partition, so concurrent upserts never touch the same conflict keys.
+    loads = [0] * partitions
+    owners: Dict[int, int] = {}
+    for home_id, count in rows_per_home.most_common():
+        partition = loads.index(min(loads))
+        owners[home_id] = partition
+        loads[partition] += count
+    return owners
+
+
+def split_by_partition(home_ids: List[int], owners: Dict[int, int], partitions: int) -> List[List[int]]:
+    indices: List[List[int]] = [[] for _ in range(partitions)]
+    for index, home_id in enumerate(home_ids):
+        indices[owners[home_id]].append(index)
+    return indices
+
+
+def validate_references(cursor: Any, summary: ParseSummary) -> None:
+    # Checked against the distinct ids before anything is loaded, so a failed check never leaves rows behind.
+    climate_keys = set(zip(summary.climate.home_tado_id, summary.climate.zone_tado_id))
+    cursor.execute(
+        """
+        WITH climate_keys AS (
+            SELECT * FROM unnest(%s::bigint[], %s::bigint[]) AS k (tado_home_id, tado_zone_id)
+        ), weather_homes AS (
+            SELECT unnest(%s::bigint[]) AS tado_home_id
+        ), missing_climate_homes AS (
+            SELECT COUNT(*) AS n
+            FROM climate_keys c
+            LEFT JOIN homes h ON h.tado_home_id = c.tado_home_id
+            WHERE h.id IS NULL
+        ), missing_weather_homes AS (
+            SELECT COUNT(*) AS n
+            FROM weather_homes w
+            LEFT JOIN homes h ON h.tado_home_id = w.tado_home_id
+            WHERE h.id IS NULL
+        ), missing_climate_zones AS (
+            SELECT COUNT(*) AS n
+            FROM climate_keys c
+            JOIN homes h ON h.tado_home_id = c.tado_home_id
+            LEFT JOIN zones z ON z.home_id = h.id AND z.tado_zone_id = c.tado_zone_id
+            WHERE c.tado_zone_id IS NOT NULL AND z.id IS NULL
+        )
+        SELECT mch.n, mwh.n, mcz.n
+        FROM missing_climate_homes mch, missing_weather_homes mwh, missing_climate_zones mcz
+        """,
+        (
+            [home_id for home_id, _ in climate_keys],
+            [zone_id for _, zone_id in climate_keys],
+            list(set(summary.weather.home_tado_id)),
+        ),
+    )
+    missing_climate_homes, missing_weather_homes, missing_climate_zones = cursor.fetchone()
+    if missing_climate_homes:
+        raise RuntimeError("Missing homes for some climate rows")
+    if missing_weather_homes:
+        raise RuntimeError("Missing homes for some weather rows")
+    if missing_climate_zones:
+        raise RuntimeError("Missing zones for some climate rows")
+
+
+class PartitionAborted(RuntimeError):
+    pass
+
+
+def upsert_home_partition(
+    database_url: str,
+    summary: ParseSummary,
+    climate_indices: List[int],
+    weather_indices: List[int],
+    dry_run_rollback: bool,
+    barrier: threading.Barrier,
+    preview: Optional[str],
+) -> Tuple[int, int, int, int]:
+    psycopg = get_psycopg()
+    with psycopg.connect(database_url) as conn:
+        try:
+            counts = upsert_rows(
+                conn,
+                summary.climate.rows(climate_indices),
+                summary.weather.rows(weather_indices),
+                preview=preview,
+                connections=barrier.parties,
+            )
+        except BaseException:
+            barrier.abort()
+            raise
+        # Nobody commits until every partition has upserted, so a failure anywhere rolls all of them back.
+        try:
+            barrier.wait()
+        except threading.BrokenBarrierError:
+            conn.rollback()
+            raise PartitionAborted("Import aborted: another partition failed")
+        if dry_run_rollback:
+            conn.rollback()
+        else:
+            conn.commit()
+        return counts
+
+
+def upsert_into_database(
+    database_url: str, summary: ParseSummary, dry_run_rollback: bool, connections: int = 1
+) -> Tuple[int, int, int, int]:
+    psycopg = get_psycopg()
+    try:
+        owners = assign_homes(summary, connections) if connections > 1 else {}
+        partitions = len(set(owners.values()))
+        if partitions <= 1:
+            with psycopg.connect(database_url) as conn:
+                with conn.cursor() as cur:
+                    validate_references(cur, summary)
+                counts = upsert_rows(conn, summary.climate.rows(), summary.weather.rows(), preview='')
                 if dry_run_rollback:
                     conn.rollback()
                 else:
                     conn.commit()
+                return counts
 
-                return climate_inserted, climate_updated, weather_inserted, weather_updated
+        with psycopg.connect(database_url) as conn:
+            with conn.cursor() as cur:
+                validate_references(cur, summary)
+
+        from concurrent.futures import ThreadPoolExecutor
+
+        # Rows are split by owning partition once, so each thread only ever touches its own rows.
+        climate_indices = split_by_partition(summary.climate.home_tado_id, owners, partitions)
+        weather_indices = split_by_partition(summary.weather.home_tado_id, owners, partitions)
+        barrier = threading.Barrier(partitions)
+
+        # One backend per partition, each with its own temp tables; commits are held back by the barrier.
+        with ThreadPoolExecutor(max_workers=partitions) as executor:
+            futures = [
+                executor.submit(
+                    upsert_home_partition,
+                    database_url,
+                    summary,
+                    climate_indices[partition],
+                    weather_indices[partition],
+                    dry_run_rollback,
+                    barrier,
+                    f', first of {partitions} home partitions' if partition == 0 else None,
+                )
+                for partition in range(partitions)
+            ]
+        errors = [future.exception() for future in futures if future.exception() is not None]
+        if errors:
+            # Report the partition that actually failed rather than the ones it aborted.
+            raise next((error for error in errors if not isinstance(error, PartitionAborted)), errors[0])
+        climate_inserted, climate_updated, weather_inserted, weather_updated = (
+            sum(counts) for counts in zip(*(future.result() for future in futures))
+        )
+        return climate_inserted, climate_updated, weather_inserted, weather_updated
     except psycopg.Error as exc:
         raise RuntimeError(f'Database error: {exc}')
 
@@ -654,6 +1057,21 @@ def run(argv: Optional[List[str]] = None) -> int:
         action="store_true",
         help="Execute database writes inside a transaction that is rolled back at the end",
     )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="Number of worker processes used to parse the CSV (default: CPU count)",
+    )
+    parser.add_argument(
+        "--db-connections",
+        type=int,
+        default=1,
+        help="Upsert homes in parallel over this many database connections; references are validated up "
+        "front and all connections commit together once every upsert succeeded, but a failure during the "
+        "final commits themselves can still leave a partial import. The per-session work_mem, "
+        "maintenance_work_mem and temp_buffers budgets are divided between the connections",
+    )
     args = parser.parse_args(argv)
 
     if args.parse_only and args.rollback:
@@ -664,7 +1082,9 @@ def run(argv: Optional[List[str]] = None) -> int:
         print(f"Input file not found: {args.csv}", file=sys.stderr)
         return 1
 
-    summary = parse_csv(args.csv)
+    parse_started = perf_counter()
+    summary = parse_csv(args.csv, max(1, args.jobs))
+    print(f"Parsed CSV in {perf_counter() - parse_started:.2f}s", file=sys.stderr)
     write_summary(summary)
     display_sample(summary)
 
@@ -678,13 +1098,15 @@ def run(argv: Optional[List[str]] = None) -> int:
         print("DATABASE_URL must be set", file=sys.stderr)
         return 1
 
+    upload_started = perf_counter()
     try:
         climate_inserted, climate_updated, weather_inserted, weather_updated = upsert_into_database(
-            database_url, summary, args.rollback
+            database_url, summary, args.rollback, max(1, args.db_connections)
         )
     except RuntimeError as exc:
         print(str(exc), file=sys.stderr)
         return 1
+    print(f"Database upload finished in {perf_counter() - upload_started:.2f}s", file=sys.stderr)
 
     print(
         f"Climate rows inserted: {climate_inserted}, updated: {climate_updated}",